@@ -22,6 +22,7 @@ from .effects import EffectMixin
 from .effects import ImpulseResponseMixin
 from .ffmpeg import FFMPEGMixin
 from .loudness import LoudnessMixin
+from .loudness import Meter
 from .playback import PlayMixin
 from .whisper import WhisperMixin
 
@@ -233,7 +234,7 @@ class AudioSignal(
     @classmethod
     def salient_excerpts(
         cls,
-        audio_path: typing.Union[str, Path],
+        audio_path: typing.Union[str, Path, "AudioSignal"],
         loudness_cutoff: float = None,
         num_tries: int = 8,
         state: typing.Union[np.random.RandomState, int] = None,
@@ -241,14 +242,42 @@ class AudioSignal(
         max_excerpts: int = None,
         duration: float = None,
     ):
-        state = util.random_state(state)
-        info = util.info(audio_path)
-        if isinstance(audio_path, io.IOBase):
-            audio_path.seek(0)
+        """Draws several excerpts of ``duration`` seconds from a single
+        audio file, each above a specified loudness threshold. The file
+        is only read once, and all excerpts are sliced from it.
 
-        signal = cls(audio_path)
-        
-        total_duration = info.duration
+        Parameters
+        ----------
+        audio_path : typing.Union[str, Path, AudioSignal]
+            Path to audio file to grab excerpts from, or an already
+            loaded AudioSignal.
+        loudness_cutoff : float, optional
+            Loudness threshold in dB, by default None
+        num_tries : int, optional
+            Number of tries to grab each excerpt above the threshold
+            before giving up, by default 8.
+        state : typing.Union[np.random.RandomState, int], optional
+            RandomState or seed of random state, by default None
+        num_excerpts : typing.Union[int, float], optional
+            Number of excerpts to draw. If a float, it is the number of
+            excerpts per ``duration`` seconds of audio, by default 2
+        max_excerpts : int, optional
+            Maximum number of excerpts when ``num_excerpts`` is a float,
+            by default None
+        duration : float, optional
+            Duration of each excerpt, by default None
+
+        Returns
+        -------
+        AudioSignal
+            Batch of excerpts.
+        """
+        if isinstance(audio_path, AudioSignal):
+            signal = audio_path
+        else:
+            signal = cls(audio_path)
+
+        total_duration = signal.signal_duration
         state = util.random_state(state)
         lower_bound = 0
         upper_bound = max(total_duration - duration, 0)
@@ -258,6 +287,20 @@ class AudioSignal(
             num_excerpts = math.ceil(total_duration / duration * num_excerpts)
             if max_excerpts is not None:
                 num_excerpts = min(num_excerpts, max_excerpts)
+
+        # When the excerpts cover at least the whole file, filter the file
+        # once and measure each candidate window from the cumulative energy,
+        # instead of filtering every window. Windows shorter than 0.5s are
+        # padded by ``loudness``, so they keep measuring the excerpt directly.
+        meter = None
+        if (
+            loudness_cutoff is not None
+            and duration >= 0.5
+            and num_excerpts * duration >= total_duration
+        ):
+            meter = Meter(signal.sample_rate).to(signal.device)
+            energy = meter.cumulative_energy(signal.audio_data.permute(0, 2, 1))
+
         for _ in range(num_excerpts):
             if loudness_cutoff is None:
                 offset = state.uniform(lower_bound, upper_bound)
@@ -270,7 +313,12 @@ class AudioSignal(
                     offset = state.uniform(lower_bound, upper_bound)
                     offset_frames = int(offset * signal.sample_rate)
                     signal_excerpt = signal[..., offset_frames:offset_frames+duration_frames]
-                    loudness = signal_excerpt.loudness()
+                    if meter is None:
+                        loudness = signal_excerpt.loudness()
+                    else:
+                        loudness = meter.windowed_loudness(
+                            energy, offset_frames, duration_frames
+                        ).clamp(min=cls.MIN_LOUDNESS)
                     num_try += 1
                     if num_tries is not None and num_try >= num_tries:
                         break
@@ -841,7 +889,7 @@ class AudioSignal(
         return self
 
     # Tensor operations
-    def to(self, device: str):
+    def to(self, device: str, non_blocking: bool = False):
         """Moves all tensors contained in signal to the specified device.
 
         Parameters
@@ -849,6 +897,9 @@ class AudioSignal(
         device : str
             Device to move AudioSignal onto. Typical values are
             "cuda", "cpu", or "cuda:n" to specify the nth gpu.
+        non_blocking : bool, optional
+            Whether to copy asynchronously with respect to the host,
+            if possible (e.g. from pinned memory to a GPU), by default False
 
         Returns
         -------
@@ -856,11 +907,24 @@ class AudioSignal(
             AudioSignal with all tensors moved to specified device.
         """
         if self._loudness is not None:
-            self._loudness = self._loudness.to(device)
+            self._loudness = self._loudness.to(device, non_blocking=non_blocking)
         if self.stft_data is not None:
-            self.stft_data = self.stft_data.to(device)
+            self.stft_data = self.stft_data.to(device, non_blocking=non_blocking)
         if self.audio_data is not None:
-            self.audio_data = self.audio_data.to(device)
+            self.audio_data = self.audio_data.to(device, non_blocking=non_blocking)
+        return self
+
+    def pin_memory(self):
+        """Pins the audio data to page-locked memory, so that it can be
+        copied to the GPU asynchronously. Called by
+        ``torch.utils.data.DataLoader`` when ``pin_memory=True``.
+
+        Returns
+        -------
+        AudioSignal
+            AudioSignal with audio data in pinned memory.
+        """
+        self.audio_data = self.audio_data.pin_memory()
         return self
 
     def float(self):
@@ -1,4 +1,5 @@
 import copy
+import math
 
 import julius
 import numpy as np
@@ -200,19 +201,35 @@ class Meter(torch.nn.Module):
         if input_data.ndim < 3:
             input_data = input_data.unsqueeze(0)
 
-        nb, nt, nch = input_data.shape
-
         # Apply frequency weighting filters - account
         # for the acoustic respose of the head and auditory system
         input_data = self.apply_filter(input_data)
 
-        G = self.G  # channel gains
         T_g = self.block_size  # 400 ms gating block standard
-        Gamma_a = -70.0  # -70 LKFS = absolute loudness threshold
-
         unfolded = self._unfold(input_data)
 
         z = (1.0 / (T_g * self.rate)) * unfolded.square().sum(2)
+        return self._gated_loudness(z)
+
+    def _gated_loudness(self, z: torch.Tensor):
+        """Gates the mean square energy of each block and
+        computes loudness from the blocks that remain.
+
+        Parameters
+        ----------
+        z : torch.Tensor
+            Mean square energy of each gating block, of shape
+            (nb, nch, n_blocks).
+
+        Returns
+        -------
+        torch.Tensor
+            Loudness of each item in the batch.
+        """
+        nb, nch, _ = z.shape
+        G = self.G  # channel gains
+        Gamma_a = -70.0  # -70 LKFS = absolute loudness threshold
+
         l = -0.691 + 10.0 * torch.log10((G[None, :nch, None] * z).sum(1, keepdim=True))
         l = l.expand_as(z)
 
@@ -247,6 +264,67 @@ class Meter(torch.nn.Module):
         LUFS = -0.691 + 10.0 * torch.log10((G[None, :nch] * z_avg_gated).sum(1))
         return LUFS.float()
 
+    def cumulative_energy(self, data: torch.Tensor):
+        """Applies the weighting filters to data, and accumulates
+        the squared result over time, so that the energy of any
+        span of samples is the difference of two entries.
+
+        Parameters
+        ----------
+        data : torch.Tensor
+            Audio data of shape (nb, nt, nch).
+
+        Returns
+        -------
+        torch.Tensor
+            Cumulative energy of shape (nb, nt + 1, nch), in double
+            precision so that long files don't lose precision.
+        """
+        data = self.apply_filter(data.float())
+        energy = data.double().square().cumsum(1)
+        return F.pad(energy, (0, 0, 1, 0))
+
+    def windowed_loudness(
+        self, cumulative_energy: torch.Tensor, offset: int, window_length: int
+    ):
+        """Computes integrated loudness of the window of ``window_length``
+        samples starting at ``offset``, from the output of
+        :py:func:`cumulative_energy`. Gating blocks are laid out exactly
+        as in :py:func:`integrated_loudness`, so the result only differs
+        from measuring the sliced window by the state of the weighting
+        filters at the start of the window.
+
+        Parameters
+        ----------
+        cumulative_energy : torch.Tensor
+            Cumulative energy of shape (nb, nt + 1, nch).
+        offset : int
+            First sample of the window.
+        window_length : int
+            Length of the window in samples.
+
+        Returns
+        -------
+        torch.Tensor
+            Loudness of the window for each item in the batch.
+        """
+        T_g = self.block_size
+        kernel_size = int(T_g * self.rate)
+        stride = int(T_g * self.rate * 0.25)
+
+        end = min(offset + window_length, cumulative_energy.shape[1] - 1)
+        length = end - offset
+        n_blocks = math.ceil((max(length, kernel_size) - kernel_size) / stride) + 1
+
+        starts = offset + stride * torch.arange(
+            n_blocks, device=cumulative_energy.device
+        )
+        stops = (starts + kernel_size).clamp(max=end)
+        energy = cumulative_energy[:, stops] - cumulative_energy[:, starts]
+
+        z = (1.0 / (T_g * self.rate)) * energy.permute(0, 2, 1)
+        return self._gated_loudness(z)
+
     @property
     def filter_class(self):
         return self._filter_class
@@ -343,7 +343,11 @@ def chdir(newdir: typing.Union[Path, str]):
         os.chdir(curdir)
 
 
-def prepare_batch(batch: typing.Union[dict, list, torch.Tensor], device: str = "cpu"):
+def prepare_batch(
+    batch: typing.Union[dict, list, torch.Tensor],
+    device: str = "cpu",
+    non_blocking: bool = False,
+):
     """Moves items in a batch (typically generated by a DataLoader as a list
     or a dict) to the specified device. This works even if dictionaries
     are nested.
@@ -355,26 +359,32 @@ def prepare_batch(batch: typing.Union[dict, list, torch.Tensor], device: str = "
         the device.
     device : str, optional
         Device to move batch to, by default "cpu"
+    non_blocking : bool, optional
+        Whether to copy asynchronously with respect to the host, if
+        possible, by default False
 
     Returns
     -------
     typing.Union[dict, list, torch.Tensor]
         Batch with all values moved to the specified device.
     """
+    # Only pass non_blocking when it's set, as not every value's ``to``
+    # accepts it.
+    to_kwargs = {"non_blocking": True} if non_blocking else {}
     if isinstance(batch, dict):
         batch = flatten(batch)
         for key, val in batch.items():
             try:
-                batch[key] = val.to(device)
+                batch[key] = val.to(device, **to_kwargs)
             except:
                 pass
         batch = unflatten(batch)
     elif torch.is_tensor(batch):
-        batch = batch.to(device)
+        batch = batch.to(device, **to_kwargs)
     elif isinstance(batch, list):
         for i in range(len(batch)):
             try:
-                batch[i] = batch[i].to(device)
+                batch[i] = batch[i].to(device, **to_kwargs)
             except:
                 pass
     return batch
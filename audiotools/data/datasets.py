@@ -1,9 +1,21 @@
+import bisect
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from functools import partial
 import json
+import multiprocessing.util
 import os
+import pickle
+import queue
+import sys
+import tempfile
+import threading
+import warnings
 from pathlib import Path
-import re
 import io
+import itertools
+from types import MappingProxyType
 from typing import Any, Callable, Optional, Sequence, Iterable
 from typing import Dict
 from typing import List
@@ -11,6 +23,8 @@ from typing import Union
 import soundfile
 
 import numpy as np
+import soxr
+import torch
 from torch.utils.data import SequentialSampler
 from torch.utils.data.distributed import DistributedSampler
 import webdataset as wds
@@ -18,6 +32,303 @@ import webdataset as wds
 from ..core import AudioSignal
 from ..core import util
 
+try:
+    # orjson is several times faster than json on small metadata blobs,
+    # and accepts both str and bytes.
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# Fields added to each file's entry by build_header_index. They describe
+# the file on disk, not the excerpt the loader returns.
+_HEADER_KEYS = ("n_frames", "sample_rate", "num_channels")
+
+
+def _read_header(path: str):
+    """Reads the header of an audio file via libsndfile. Returns
+    ``None`` if the file can't be parsed, in which case the loader
+    falls back to the slower excerpt path for it.
+    """
+    try:
+        # Bytes paths, so that names that aren't valid UTF-8 still open.
+        info = soundfile.info(os.fsencode(path))
+    except (RuntimeError, soundfile.LibsndfileError):
+        return None
+    return {
+        "n_frames": info.frames,
+        "sample_rate": info.samplerate,
+        "num_channels": info.channels,
+    }
+
+
+def _header_cache_path(source: str):
+    return Path(source).with_suffix(".headers.pkl")
+
+
+def _load_header_cache(source: str):
+    cache_path = _header_cache_path(source)
+    try:
+        with open(cache_path, "rb") as f:
+            cache = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return {}
+    if cache.get("mtime") != os.path.getmtime(source):
+        return {}
+    return cache["headers"]
+
+
+def _save_header_cache(source: str, headers: dict):
+    # Written to a temporary file and moved into place, so that other
+    # processes building the same index never read a partial cache.
+    cache_path = _header_cache_path(source)
+    try:
+        fd, tmp_path = tempfile.mkstemp(
+            dir=cache_path.parent, prefix=cache_path.name, suffix=".tmp"
+        )
+    except OSError:
+        return
+    try:
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump({"mtime": os.path.getmtime(source), "headers": headers}, f)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+
+def build_header_index(
+    audio_lists: List[List[Dict[str, str]]],
+    sources: List[str],
+    num_workers: int = None,
+):
+    """Reads the header of every file in ``audio_lists`` and stores
+    ``n_frames``, ``sample_rate`` and ``num_channels`` in each entry, in-place.
+    Headers are read in a process pool. For CSV sources, the index is
+    persisted next to the CSV (as ``<name>.headers.pkl``) and reused
+    as long as the CSV is not modified.
+
+    Parameters
+    ----------
+    audio_lists : List[List[Dict[str, str]]]
+        Lists of audio files, as returned by
+        :py:func:`audiotools.core.util.read_sources`.
+    sources : List[str]
+        Sources corresponding to each list in ``audio_lists``.
+    num_workers : int, optional
+        Number of processes to read headers with, by default None
+        (number of CPUs).
+    """
+    caches = []
+    missing = set()
+    for source, audio_list in zip(sources, audio_lists):
+        source = str(source)
+        cache = _load_header_cache(source) if source.endswith(".csv") else {}
+        caches.append(cache)
+        missing.update(x["path"] for x in audio_list if x["path"] not in cache)
+
+    missing = sorted(missing)
+    headers = {}
+    if missing:
+        num_workers = num_workers or os.cpu_count()
+        chunksize = max(1, len(missing) // (4 * num_workers))
+        with ProcessPoolExecutor(max_workers=num_workers) as executor:
+            headers = dict(
+                zip(missing, executor.map(_read_header, missing, chunksize=chunksize))
+            )
+
+    for source, audio_list, cache in zip(sources, audio_lists, caches):
+        source = str(source)
+        updated = False
+        for x in audio_list:
+            path = x["path"]
+            if path not in cache:
+                cache[path] = headers[path]
+                updated = True
+            if cache[path] is not None:
+                x.update(cache[path])
+        if updated and source.endswith(".csv"):
+            _save_header_cache(source, cache)
+    return audio_lists
+
+
+def _mono_resample(signal: AudioSignal, sample_rate: int):
+    """Downmixes ``signal`` to mono and resamples it in-place, with
+    soxr on the mono numpy data instead of julius. Output length is
+    the same as :py:func:`audiotools.core.audio_signal.AudioSignal.resample`.
+    """
+    if signal.sample_rate == sample_rate or signal.device.type != "cpu":
+        return signal.to_mono().resample(sample_rate)
+
+    mono = signal.audio_data.mean(1).numpy()
+    n_out = mono.shape[-1] * sample_rate // signal.sample_rate
+    # soxr takes (time, channels), so batch items are resampled as channels.
+    resampled = soxr.resample(mono.T, signal.sample_rate, sample_rate)
+    resampled = np.ascontiguousarray(resampled[:n_out].T)
+
+    signal.audio_data = torch.from_numpy(resampled).unsqueeze(1)
+    signal.sample_rate = sample_rate
+    return signal
+
+
+_CORRUPT_LOG = "/tmp/corrupt.txt"
+_corrupt_lock = threading.Lock()
+_corrupt_queue = None
+_corrupt_pid = None
+
+
+def _write_corrupt_paths(paths: queue.Queue, log_path: str, flush_every: int = 64):
+    with open(log_path, "a+") as f:
+        n_unflushed = 0
+        while True:
+            path = paths.get()
+            if path is None:
+                break
+            try:
+                f.write(f"{path}\n")
+            except UnicodeEncodeError:
+                pass
+            n_unflushed += 1
+            if n_unflushed >= flush_every or paths.empty():
+                f.flush()
+                n_unflushed = 0
+
+
+def _stop_corrupt_writer(paths: queue.Queue, writer: threading.Thread):
+    paths.put(None)
+    writer.join()
+
+
+def _log_corrupt(path: str):
+    """Records ``path`` in ``/tmp/corrupt.txt`` from a background thread,
+    which keeps the file open. The thread is started lazily in each
+    process, so that forked dataloader workers get their own, and is
+    drained when the process exits.
+    """
+    global _corrupt_queue, _corrupt_pid
+    with _corrupt_lock:
+        if _corrupt_pid != os.getpid():
+            _corrupt_queue = queue.Queue()
+            writer = threading.Thread(
+                target=_write_corrupt_paths,
+                args=(_corrupt_queue, _CORRUPT_LOG),
+                daemon=True,
+            )
+            writer.start()
+            # Unlike atexit, multiprocessing's finalizers also run when
+            # a dataloader worker process exits.
+            multiprocessing.util.Finalize(
+                None,
+                _stop_corrupt_writer,
+                args=(_corrupt_queue, writer),
+                exitpriority=0,
+            )
+            _corrupt_pid = os.getpid()
+    _corrupt_queue.put(path)
+
+
+@lru_cache(maxsize=16)
+def _zero_signal(duration: float, sample_rate: int, num_channels: int):
+    # Template for missing or unreadable files. Callers must clone it.
+    return AudioSignal.zeros(duration, sample_rate, num_channels)
+
+
+# Stands in for files that are out of range. There is nothing to merge
+# into the signal's metadata for it.
+_EMPTY_INFO = MappingProxyType({"path": "none"})
+
+
+def _pack_strings(values: List[str]):
+    # Surrogate escapes keep paths that aren't valid UTF-8 (as returned by
+    # glob on Linux) round-tripping, like os.fsencode does.
+    encoded = [v.encode("utf-8", "surrogateescape") for v in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(v) for v in encoded], out=offsets[1:])
+    return b"".join(encoded), offsets
+
+
+class _AudioColumns:
+    """Audio files of a single source, stored column-wise rather than
+    as a dict per file. Fields present on most files (the path, CSV
+    columns, and the header fields of :py:func:`build_header_index`)
+    become columns: strings are concatenated into one UTF-8 buffer, and
+    integers into a NumPy array. Any other fields are kept in a sparse
+    dict by row. The few large objects this leaves are shared
+    copy-on-write by forked dataloader workers, where millions of small
+    dicts would be copied as their reference counts are touched.
+
+    Indexing returns the same dict :py:func:`audiotools.core.util.read_sources`
+    would have, built on demand.
+    """
+
+    def __init__(self, audio_list: List[Dict[str, Any]]):
+        self._len = len(audio_list)
+        counts = {}
+        for x in audio_list:
+            for k in x:
+                counts[k] = counts.get(k, 0) + 1
+
+        # Maps each key to (mask of rows that have it or None, values).
+        self._columns = {}
+        sparse = []
+        for key, count in counts.items():
+            column = None
+            if key == "path" or 2 * count > self._len:
+                column = self._build_column(audio_list, key)
+            if column is None:
+                sparse.append(key)
+            else:
+                present = None
+                if count < self._len:
+                    present = np.array([key in x for x in audio_list])
+                self._columns[key] = (present, column)
+
+        self._attrs = {}
+        for idx, x in enumerate(audio_list):
+            attrs = {k: x[k] for k in sparse if k in x}
+            if attrs:
+                self._attrs[idx] = attrs
+
+    @staticmethod
+    def _build_column(audio_list: List[Dict[str, Any]], key: str):
+        values = [x.get(key) for x in audio_list]
+        present = [v for x, v in zip(audio_list, values) if key in x]
+        if all(type(v) is int for v in present):
+            try:
+                return np.array([0 if v is None else v for v in values], np.int64)
+            except OverflowError:
+                return None
+        if all(type(v) is str for v in present):
+            return _pack_strings(["" if v is None else v for v in values])
+        return None
+
+    def __len__(self):
+        return self._len
+
+    def __getitem__(self, idx: int):
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError(f"Index {idx} out of range for {len(self)} files.")
+
+        audio_info = {}
+        for key, (present, column) in self._columns.items():
+            if present is not None and not present[idx]:
+                continue
+            if isinstance(column, np.ndarray):
+                audio_info[key] = int(column[idx])
+            else:
+                buffer, offsets = column
+                value = buffer[offsets[idx] : offsets[idx + 1]]
+                audio_info[key] = value.decode("utf-8", "surrogateescape")
+        audio_info.update(self._attrs.get(idx, ()))
+        return audio_info
+
+    def __iter__(self):
+        return (self[idx] for idx in range(len(self)))
+
 
 class AudioLoader:
     """Loads audio endlessly from a list of audio sources
@@ -46,6 +357,10 @@ class AudioLoader:
         Whether to shuffle the files within the dataloader. Defaults to True.
     shuffle_state: int
         State to use to seed the shuffle of the files.
+    index_headers : bool, optional
+        Whether to read the header of every file up front (see
+        :py:func:`build_header_index`), so that excerpts can be read with a
+        single seek instead of probing the file on every call, by default False.
     """
 
     def __init__(
@@ -57,24 +372,128 @@ class AudioLoader:
         ext: List[str] = util.AUDIO_EXTENSIONS,
         shuffle: bool = True,
         shuffle_state: int = 0,
+        index_headers: bool = False,
     ):
-        self.audio_lists = util.read_sources(
-            sources, relative_path=relative_path, ext=ext
+        audio_lists = util.read_sources(sources, relative_path=relative_path, ext=ext)
+        if index_headers:
+            build_header_index(audio_lists, sources)
+        self._columns = [_AudioColumns(l) for l in audio_lists]
+
+        # (source_idx, item_idx) pairs, packed into the high and low 32 bits
+        # of a single int64 each.
+        self._packed_indices = np.concatenate(
+            [np.empty(0, dtype=np.int64)]
+            + [
+                (np.int64(src_idx) << 32) | np.arange(len(src), dtype=np.int64)
+                for src_idx, src in enumerate(self._columns)
+            ]
         )
-
-        self.audio_indices = [
-            (src_idx, item_idx)
-            for src_idx, src in enumerate(self.audio_lists)
-            for item_idx in range(len(src))
-        ]
         if shuffle:
             state = util.random_state(shuffle_state)
-            state.shuffle(self.audio_indices)
+            state.shuffle(self._packed_indices)
 
         self.sources = sources
+        self._sources_str = [sys.intern(str(s)) for s in sources]
         self.weights = weights
         self.transform = transform
 
+    @property
+    def audio_lists(self):
+        """Audio files of each source, as lists of dicts. The lists are
+        built from the column storage on every access, so modifying them
+        has no effect until they are assigned back.
+        """
+        return [list(columns) for columns in self._columns]
+
+    @audio_lists.setter
+    def audio_lists(self, audio_lists: List[List[Dict[str, Any]]]):
+        self._columns = [_AudioColumns(l) for l in audio_lists]
+
+    @property
+    def audio_indices(self):
+        """List of ``(source_idx, item_idx)`` tuples, in the order files
+        are drawn when sampling without replacement.
+        """
+        return [(int(p >> 32), int(p & 0xFFFFFFFF)) for p in self._packed_indices]
+
+    @staticmethod
+    def _fast_read(path: str, offset: float, duration: float, offset_frame: int = None):
+        """Reads ``duration`` seconds at ``offset`` with a single
+        seek + read, without going through librosa. Falls back to
+        :py:class:`audiotools.core.audio_signal.AudioSignal` for files
+        libsndfile can't open. ``offset_frame`` is the exact frame
+        recorded by :py:func:`AudioLoader._salient_read`, if any.
+        """
+        try:
+            f = soundfile.SoundFile(os.fsencode(path), "r")
+        except soundfile.LibsndfileError:
+            return AudioSignal(path, offset=offset, duration=duration)
+
+        with f:
+            sample_rate = f.samplerate
+            # Same arithmetic as librosa, unless the excerpt was drawn by
+            # _salient_read at this sample rate: frame / sample_rate doesn't
+            # always round-trip, so it records the frame itself.
+            start = int(offset * sample_rate)
+            if offset_frame is not None and round(offset * sample_rate) == offset_frame:
+                start = offset_frame
+            f.seek(start)
+            data = f.read(int(duration * sample_rate), dtype="float32", always_2d=True)
+        if data.shape[0] == 0:
+            raise RuntimeError(
+                f"Audio file {path} with offset {offset} and duration {duration} is empty!"
+            )
+
+        signal = AudioSignal(data.T, sample_rate)
+        signal.path_to_file = path
+        signal.metadata["offset"] = offset
+        signal.metadata["duration"] = duration
+        return signal
+
+    @staticmethod
+    def _salient_read(
+        audio_info: Dict[str, Any],
+        duration: float,
+        state: np.random.RandomState,
+        loudness_cutoff: float = None,
+        num_tries: int = 8,
+    ):
+        """Equivalent of :py:func:`audiotools.core.audio_signal.AudioSignal.salient_excerpt`
+        for files whose header was indexed by :py:func:`build_header_index`.
+        The file is opened once, and each try is a seek + read on the same handle.
+        """
+        path = audio_info["path"]
+        sample_rate = int(audio_info["sample_rate"])
+        n_frames = int(audio_info["n_frames"])
+        duration_frames = int(duration * sample_rate)
+        upper_bound = max(n_frames - duration_frames, 0)
+
+        with soundfile.SoundFile(os.fsencode(path), "r") as f:
+            loudness = -np.inf
+            num_try = 0
+            while loudness_cutoff is None or loudness <= loudness_cutoff:
+                start = state.randint(upper_bound + 1)
+                f.seek(start)
+                data = f.read(duration_frames, dtype="float32", always_2d=True)
+                if data.shape[0] == 0:
+                    raise RuntimeError(
+                        f"Audio file {path} with offset {start / sample_rate} "
+                        f"and duration {duration} is empty!"
+                    )
+                signal = AudioSignal(data.T, sample_rate)
+                if loudness_cutoff is None:
+                    break
+                loudness = signal.loudness()
+                num_try += 1
+                if num_tries is not None and num_try >= num_tries:
+                    break
+
+        signal.path_to_file = path
+        signal.metadata["offset"] = start / sample_rate
+        signal.metadata["offset_frame"] = start
+        signal.metadata["duration"] = duration
+        return signal
+
     def __call__(
         self,
         state,
@@ -83,37 +502,45 @@ class AudioLoader:
         loudness_cutoff: float = -40,
         num_channels: int = 1,
         offset: float = None,
+        offset_frame: int = None,
         source_idx: int = None,
         item_idx: int = None,
         global_idx: int = None,
     ):
         if source_idx is not None and item_idx is not None:
             try:
-                audio_info = self.audio_lists[source_idx][item_idx]
+                audio_info = self._columns[source_idx][item_idx]
             except:
-                audio_info = {"path": "none"}
+                audio_info = _EMPTY_INFO
         elif global_idx is not None:
-            source_idx, item_idx = self.audio_indices[
-                global_idx % len(self.audio_indices)
-            ]
-            audio_info = self.audio_lists[source_idx][item_idx]
+            packed = self._packed_indices[global_idx % len(self._packed_indices)]
+            source_idx, item_idx = int(packed >> 32), int(packed & 0xFFFFFFFF)
+            audio_info = self._columns[source_idx][item_idx]
         else:
             audio_info, source_idx, item_idx = util.choose_from_list_of_lists(
-                state, self.audio_lists, p=self.weights
+                state, self._columns, p=self.weights
             )
 
         path = audio_info["path"]
-        signal = AudioSignal.zeros(duration, sample_rate, num_channels)
+        signal = None
 
         if path != "none":
             if offset is None:
                 try:
-                    signal = AudioSignal.salient_excerpt(
-                        path,
-                        duration=duration,
-                        state=state,
-                        loudness_cutoff=loudness_cutoff,
-                    )
+                    if "n_frames" in audio_info:
+                        signal = self._salient_read(
+                            audio_info,
+                            duration=duration,
+                            state=state,
+                            loudness_cutoff=loudness_cutoff,
+                        )
+                    else:
+                        signal = AudioSignal.salient_excerpt(
+                            path,
+                            duration=duration,
+                            state=state,
+                            loudness_cutoff=loudness_cutoff,
+                        )
                 except (RuntimeError, soundfile.LibsndfileError) as e:
                     if (
                         isinstance(e, soundfile.LibsndfileError)
@@ -122,48 +549,142 @@ class AudioLoader:
                         or "is empty!" in str(e)
                     ):
                         print(f"Error loading audio at {path}. Skipping...")
-                        with open("/tmp/corrupt.txt", "a+") as file:
-                            try:
-                                file.write(f"{path}\n")
-                            except UnicodeEncodeError:
-                                pass
+                        _log_corrupt(path)
                     else:
                         raise e
             else:
-                signal = AudioSignal(
-                    path,
-                    offset=offset,
-                    duration=duration,
-                )
+                signal = self._fast_read(path, offset, duration, offset_frame)
+
+        if signal is None:
+            signal = _zero_signal(duration, sample_rate, num_channels).clone()
 
         if num_channels == 1:
-            signal = signal.to_mono()
-        signal = signal.resample(sample_rate)
+            signal = _mono_resample(signal, sample_rate)
+        else:
+            signal = signal.resample(sample_rate)
 
         if signal.duration < duration:
             signal = signal.zero_pad_to(int(duration * sample_rate))
 
-        for k, v in audio_info.items():
-            signal.metadata[k] = v
+        if audio_info is not _EMPTY_INFO:
+            # Header fields would contradict the resampled signal.
+            signal.metadata.update(
+                (k, v) for k, v in audio_info.items() if k not in _HEADER_KEYS
+            )
 
         item = {
             "signal": signal,
             "source_idx": source_idx,
             "item_idx": item_idx,
-            "source": str(self.sources[source_idx]),
-            "path": str(path),
+            "source": self._sources_str[source_idx],
+            "path": path,
         }
         if self.transform is not None:
             item["transform_args"] = self.transform.instantiate(state, signal=signal)
         return item
 
 
+def _build_loader(kwargs: dict):
+    return AudioLoader(**kwargs)
+
+
+def build_loaders(
+    loader_kwargs: Dict[Any, dict],
+    num_workers: int = None,
+):
+    """Constructs several AudioLoaders at once, in a process pool. Each
+    loader reads its sources independently (scanning folders or reading
+    CSVs), so for datasets with many stems (e.g. Slakh) this is much faster
+    than constructing the loaders one after the other.
+
+    Parameters
+    ----------
+    loader_kwargs : Dict[Any, dict]
+        Keyword arguments to :py:class:`AudioLoader`, for each loader.
+    num_workers : int, optional
+        Number of processes to use, by default
+        ``min(32, len(loader_kwargs))``.
+
+    Returns
+    -------
+    Dict[Any, AudioLoader]
+        Loaders, keyed like ``loader_kwargs``.
+
+    Examples
+    --------
+    >>> loaders = build_loaders(
+    >>>     {
+    >>>         f"S{i:02d}": {"sources": [slakh_path], "ext": [f"S{i:02d}.wav"]}
+    >>>         for i in range(n_sources)
+    >>>     }
+    >>> )
+    """
+    keys = list(loader_kwargs.keys())
+    if len(keys) <= 4:
+        return {k: _build_loader(loader_kwargs[k]) for k in keys}
+
+    num_workers = num_workers or min(32, len(keys))
+    with ProcessPoolExecutor(max_workers=num_workers) as executor:
+        loaders = executor.map(_build_loader, [loader_kwargs[k] for k in keys])
+        return dict(zip(keys, loaders))
+
+
 def default_matcher(x, y):
     return Path(x).parent == Path(y).parent
 
 
+def _parent_keys(audio_list: List[Dict[str, str]]):
+    return np.fromiter(
+        (hash(str(Path(x["path"]).parent)) for x in audio_list),
+        dtype=np.int64,
+        count=len(audio_list),
+    )
+
+
+def _occurrence_ranks(keys: np.ndarray):
+    # Rank of each key among the entries sharing that key, in list order.
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+    positions = np.arange(len(keys))
+    is_start = np.ones(len(keys), dtype=bool)
+    is_start[1:] = sorted_keys[1:] != sorted_keys[:-1]
+    group_start = np.maximum.accumulate(np.where(is_start, positions, 0))
+    ranks = np.empty(len(keys), dtype=np.int64)
+    ranks[order] = positions - group_start
+    return ranks
+
+
 def align_lists(lists, matcher: Callable = default_matcher):
+    """Aligns lists of audio files in-place, so that the i-th entry
+    of every list matches the i-th entry of the longest list. Gaps are
+    filled with ``{"path": "none"}``.
+
+    With the default matcher, files are matched by parent directory via
+    a hash join, where the k-th file in a directory of one list is
+    matched to the k-th file in the same directory of the longest list.
+    Custom matchers fall back to a pairwise scan.
+    """
     longest_list = lists[np.argmax([len(l) for l in lists])]
+
+    if matcher is default_matcher:
+        ref_keys = _parent_keys(longest_list)
+        ref_ranks = _occurrence_ranks(ref_keys)
+        for l in lists:
+            if l is longest_list:
+                continue
+            keys = _parent_keys(l)
+            order = np.argsort(keys, kind="stable")
+            sorted_keys = keys[order]
+
+            positions = np.searchsorted(sorted_keys, ref_keys) + ref_ranks
+            found = positions < len(l)
+            found[found] = sorted_keys[positions[found]] == ref_keys[found]
+            l[:] = [
+                l[order[p]] if f else {"path": "none"}
+                for p, f in zip(positions.tolist(), found.tolist())
+            ]
+        return lists
+
     for i, x in enumerate(longest_list):
         for l in lists:
             if i >= len(l):
@@ -335,17 +856,20 @@ class AudioDataset:
     >>>     src_names = [x.name for x in list(slakh_path.glob("**/*.wav"))  if "S" in str(x.name)]
     >>>     n_sources = len(list(set(src_names)))
     >>>
-    >>>     loaders = {
-    >>>         f"S{i:02d}": at.datasets.AudioLoader(
-    >>>             sources=[slakh_path],
-    >>>             transform=tfm.Compose(
-    >>>                 tfm.VolumeNorm(("uniform", -20, -10)),
-    >>>                 tfm.Silence(prob=0.1),
-    >>>             ),
-    >>>             ext=[f"S{i:02d}.wav"],
-    >>>         )
-    >>>         for i in range(n_sources)
-    >>>     }
+    >>>     # Loaders are built in parallel, as each one scans the dataset.
+    >>>     loaders = at.datasets.build_loaders(
+    >>>         {
+    >>>             f"S{i:02d}": dict(
+    >>>                 sources=[slakh_path],
+    >>>                 transform=tfm.Compose(
+    >>>                     tfm.VolumeNorm(("uniform", -20, -10)),
+    >>>                     tfm.Silence(prob=0.1),
+    >>>                 ),
+    >>>                 ext=[f"S{i:02d}.wav"],
+    >>>             )
+    >>>             for i in range(n_sources)
+    >>>         }
+    >>>     )
     >>>     dataset = at.datasets.AudioDataset(
     >>>         loaders=loaders,
     >>>         sample_rate=sample_rate,
@@ -412,22 +936,30 @@ class AudioDataset:
         self.shuffle_loaders = shuffle_loaders
         self.without_replacement = without_replacement
 
+        self._keys = tuple(loaders.keys())
+
         if aligned:
             loaders_list = list(loaders.values())
-            for i in range(len(loaders_list[0].audio_lists)):
-                input_lists = [l.audio_lists[i] for l in loaders_list]
+            audio_lists = [l.audio_lists for l in loaders_list]
+            for i in range(len(audio_lists[0])):
+                input_lists = [l[i] for l in audio_lists]
                 # Alignment happens in-place
                 align_lists(input_lists, matcher)
+            for loader, lists in zip(loaders_list, audio_lists):
+                loader.audio_lists = lists
 
     def __getitem__(self, idx):
         state = util.random_state(idx)
         offset = None if self.offset is None else self.offset
         item = {}
 
-        keys = list(self.loaders.keys())
+        keys = self._keys
         if self.shuffle_loaders:
+            keys = list(keys)
             state.shuffle(keys)
 
+        # Built from the attributes on every call, so that changing them
+        # after construction still reaches the loaders.
         loader_kwargs = {
             "state": state,
             "sample_rate": self.sample_rate,
@@ -446,10 +978,11 @@ class AudioDataset:
             if self.aligned:
                 # Path mapper takes the current loader + everything
                 # returned by the first loader.
-                offset = item[keys[0]]["signal"].metadata["offset"]
+                metadata = item[keys[0]]["signal"].metadata
                 loader_kwargs.update(
                     {
-                        "offset": offset,
+                        "offset": metadata["offset"],
+                        "offset_frame": metadata.get("offset_frame"),
                         "source_idx": item[keys[0]]["source_idx"],
                         "item_idx": item[keys[0]]["item_idx"],
                     }
@@ -457,7 +990,7 @@ class AudioDataset:
             item[key] = loader(**loader_kwargs)
 
         # Sort dictionary back into original order
-        keys = list(self.loaders.keys())
+        keys = self._keys
         item = {k: item[k] for k in keys}
 
         item["idx"] = idx
@@ -499,15 +1032,46 @@ class AudioDataset:
 
 
 class ConcatDataset(AudioDataset):
+    """Concatenates datasets by interleaving their items round-robin,
+    so that consecutive indices come from different datasets. Once the
+    shorter datasets run out, the remaining ones keep being interleaved.
+
+    Parameters
+    ----------
+    datasets : list
+        Datasets to concatenate.
+    """
+
     def __init__(self, datasets: list):
         self.datasets = datasets
 
+        # Split the index range into phases, during which the same set
+        # of datasets is being interleaved.
+        lengths = [len(d) for d in datasets]
+        self._phase_starts = []
+        self._phase_datasets = []
+        self._phase_offsets = []
+        start = 0
+        offset = 0
+        for length in sorted(set(lengths)):
+            active = [i for i, l in enumerate(lengths) if l > offset]
+            if length > offset:
+                self._phase_starts.append(start)
+                self._phase_datasets.append(active)
+                self._phase_offsets.append(offset)
+                start += len(active) * (length - offset)
+            offset = length
+        self._length = start
+
     def __len__(self):
-        return sum([len(d) for d in self.datasets])
+        return self._length
 
     def __getitem__(self, idx):
-        dataset = self.datasets[idx % len(self.datasets)]
-        return dataset[idx // len(self.datasets)]
+        phase = bisect.bisect_right(self._phase_starts, idx) - 1
+        local_idx = idx - self._phase_starts[phase]
+        active = self._phase_datasets[phase]
+        dataset = self.datasets[active[local_idx % len(active)]]
+        return dataset[self._phase_offsets[phase] + local_idx // len(active)]
 
 
 class ResumableDistributedSampler(DistributedSampler):  # pragma: no cover
@@ -547,12 +1111,37 @@ def log_and_continue(exn):
 
 def decode_json(key, value):
     if "json" in key:
+        if orjson is not None:
+            try:
+                return orjson.loads(value)
+            except orjson.JSONDecodeError:
+                # orjson rejects NaN, Infinity and integers beyond 64 bits,
+                # which json accepts (and json.dumps writes NaN by default).
+                pass
         return json.loads(value)
 
 
-def decode_audiosignal(
-    data: List[Dict[str, Any]],
-    offset=None,
+_AUDIO_EXTENSIONS = frozenset(util.AUDIO_EXTENSIONS)
+
+# Containers that libsndfile decodes natively, by magic bytes.
+_SOUNDFILE_MAGIC = (b"RIFF", b"fLaC", b"OggS")
+
+
+def _read_audio_bytes(value: bytes):
+    # io.BytesIO shares the bytes object's buffer, so this doesn't copy
+    # the compressed data.
+    filelike = io.BytesIO(value)
+    if value[:4] not in _SOUNDFILE_MAGIC:
+        return AudioSignal(filelike)
+
+    data, sample_rate = soundfile.read(filelike, dtype="float32", always_2d=True)
+    if data.shape[0] == 0:
+        raise RuntimeError("Audio file is empty!")
+    return AudioSignal(data.T, sample_rate)
+
+
+def _decode_sample(
+    sample: Dict[str, Any],
     duration=None,
     state=None,
     loudness_cutoff=-40,
@@ -562,54 +1151,97 @@ def decode_audiosignal(
     max_excerpts=None,
     random_mono_channel=False,
 ):
-    assert offset is None
-    for sample in data:
-        found_key = False
-        for key, value in sample.items():
-            extension = "." + re.sub(r".*[.]", "", key)
-            if extension in util.AUDIO_EXTENSIONS:
-                found_key = True
-                break
+    found_key = False
+    for key, value in sample.items():
+        extension = "." + key[key.rfind(".") + 1 :]
+        if extension in _AUDIO_EXTENSIONS:
+            found_key = True
+            break
 
-        if not found_key:
-            print(f"Warning: Failed to find audio key in sample with keys {sample.keys()}.")
-            continue
+    if not found_key:
+        print(f"Warning: Failed to find audio key in sample with keys {sample.keys()}.")
+        return []
 
-        filelike = io.BytesIO(value)
-        try:
-            signals = AudioSignal.salient_excerpts(
-                filelike,
-                duration=duration,
-                state=state,
-                loudness_cutoff=loudness_cutoff,
-                num_excerpts=num_excerpts,
-                max_excerpts=max_excerpts,
-            )
-        except (RuntimeError, soundfile.LibsndfileError, ValueError) as e:
-            if (
-                isinstance(e, soundfile.LibsndfileError)
-                or "The size of tensor a (5) must match the size of tensor b (6) at non-singleton dimension 1"
-                in str(e)
-                or "is empty!" in str(e)
-                or "array is too big" in str(e)
-            ):
-                print(f"Error loading audio. Value: {key} Skipping...")
-                continue
-            else:
-                raise e
+    try:
+        signals = AudioSignal.salient_excerpts(
+            _read_audio_bytes(value),
+            duration=duration,
+            state=state,
+            loudness_cutoff=loudness_cutoff,
+            num_excerpts=num_excerpts,
+            max_excerpts=max_excerpts,
+        )
+    except (RuntimeError, soundfile.LibsndfileError, ValueError) as e:
+        if (
+            isinstance(e, soundfile.LibsndfileError)
+            or "The size of tensor a (5) must match the size of tensor b (6) at non-singleton dimension 1"
+            in str(e)
+            or "is empty!" in str(e)
+            or "array is too big" in str(e)
+        ):
+            print(f"Error loading audio. Value: {key} Skipping...")
+            return []
+        else:
+            raise e
 
+    if num_channels == 1 and not random_mono_channel:
+        signals = _mono_resample(signals, sample_rate)
+    else:
         if num_channels == 1:
-            if random_mono_channel:
-                signals = signals.to_rand_mono()
-            else:
-                signals = signals.to_mono()
+            signals = signals.to_rand_mono()
         signals = signals.resample(sample_rate)
 
-        if signals.duration < duration:
-            signals = signals.zero_pad_to(int(duration * sample_rate))
-        del sample[key]
-        for signal in signals:
-            yield {**sample, "signal": signal}
+    if signals.duration < duration:
+        signals = signals.zero_pad_to(int(duration * sample_rate))
+    del sample[key]
+    return [{**sample, "signal": signal} for signal in signals]
+
+
+def decode_audiosignal(
+    data: List[Dict[str, Any]],
+    offset=None,
+    duration=None,
+    state=None,
+    loudness_cutoff=-40,
+    num_channels=1,
+    sample_rate=44100,
+    num_excerpts=50,
+    max_excerpts=None,
+    random_mono_channel=False,
+    num_threads=1,
+):
+    assert offset is None
+    decode = partial(
+        _decode_sample,
+        duration=duration,
+        loudness_cutoff=loudness_cutoff,
+        num_channels=num_channels,
+        sample_rate=sample_rate,
+        num_excerpts=num_excerpts,
+        max_excerpts=max_excerpts,
+        random_mono_channel=random_mono_channel,
+    )
+    if num_threads <= 1:
+        for sample in data:
+            yield from decode(sample, state=state)
+        return
+
+    def _decode_seeded(sample, seed):
+        return decode(sample, state=util.random_state(seed))
+
+    # libsndfile and torch release the GIL, so windows of samples
+    # can be decoded concurrently. Each sample gets its own seed, drawn
+    # in order, so the excerpts don't depend on thread scheduling.
+    state = util.random_state(state)
+    data = iter(data)
+    with ThreadPoolExecutor(num_threads) as executor:
+        while True:
+            window = list(itertools.islice(data, num_threads))
+            if not window:
+                break
+            seeds = state.randint(2**31, size=len(window))
+            for outputs in executor.map(_decode_seeded, window, seeds):
+                yield from outputs
 
 
 def combine_json(data: Dict[str, Any]):
@@ -619,8 +1251,7 @@ def combine_json(data: Dict[str, Any]):
     except IndexError:
         return None
     data["json"] = data.pop(json_key)
-    for k, v in data["json"].items():
-        data[audio_key].metadata[k] = v
+    data[audio_key].metadata.update(data["json"])
     return {"signal": data[audio_key]}
 
 
@@ -628,6 +1259,27 @@ def add_transform_args(data: Dict[str, Any], transform=None, state=None):
     data["transform_args"] = transform.instantiate(state, signal=data["signal"])
     return data
 
+
+def combine_json_and_transform_args(
+    data: Iterable[Dict[str, Any]], transform=None, state=None
+):
+    """Equivalent of mapping :py:func:`combine_json` and then
+    :py:func:`add_transform_args` over a stream of samples, in
+    a single pipeline stage.
+    """
+    for sample in data:
+        json_key = next((k for k in sample if "json" in k), None)
+        if json_key is None:
+            continue
+        signal = sample["signal"]
+        signal.metadata.update(sample[json_key])
+
+        output = {"signal": signal, "__key__": sample.get("__key__")}
+        if transform is not None:
+            output["transform_args"] = transform.instantiate(state, signal=signal)
+        yield output
+
+
 def custom_tarfile_samples(
     src: Iterable[Dict[str, Any]],
     handler: Callable[[Exception], bool] = wds.tariterators.reraise_exception,
@@ -659,6 +1311,22 @@ def run_transform(data: Dict[str, Any], transform=None):
     )
     return {"signal": signal}
 
+
+def cast_signal(data: Dict[str, Any], dtype: torch.dtype = torch.float32):
+    """Casts the audio data of ``data["signal"]`` to ``dtype``, e.g. to
+    halve the bytes moved from dataloader workers to the GPU. Floating
+    point audio is quantized to the full range for ``torch.int16``, and can
+    be recovered with ``signal.audio_data.float() / 32768``.
+    """
+    signal = data["signal"]
+    if dtype == torch.int16:
+        audio_data = (signal.audio_data * 32768).round_().clamp_(-32768, 32767)
+        signal.audio_data = audio_data.to(torch.int16)
+    else:
+        signal.audio_data = signal.audio_data.to(dtype)
+    return data
+
+
 class CustomWebDataset(wds.WebDataset):
     def __init__(
         self,
@@ -679,6 +1347,8 @@ class CustomWebDataset(wds.WebDataset):
         random_mono_channel: bool = False,
         share_urls_between_workers: bool = False,
         run_transform_in_dataset: bool = False,
+        decode_concurrency: int = 1,
+        output_dtype: Optional[Union[str, torch.dtype]] = None,
         **kwargs,
     ):
         if share_urls_between_workers:
@@ -711,24 +1381,30 @@ class CustomWebDataset(wds.WebDataset):
             num_excerpts=num_excerpts,
             max_excerpts=max_excerpts,
             random_mono_channel=random_mono_channel,
+            num_threads=decode_concurrency,
         )
         self.decode(decode_json)
         self.compose(_decode_audiosignal)
-        self.map(combine_json)
-
-        if transform is not None:
-            _add_transform_args = partial(
-                add_transform_args, transform=transform, state=state
-            )
-            self.map(_add_transform_args)
+        self.compose(
+            partial(combine_json_and_transform_args, transform=transform, state=state)
+        )
 
         if shuffle is not None:
+            # wds draws from the buffer by swapping with the last element
+            # and popping, so this is O(1) per sample.
             self.shuffle(shuffle, initial=shuffle_initial)
 
         if transform is not None and run_transform_in_dataset:
             _run_transform = partial(run_transform, transform=transform)
             self.map(_run_transform)
 
+        if output_dtype is not None:
+            # Audio is decoded, gated and resampled in float32, and only
+            # cast on its way out of the pipeline.
+            if isinstance(output_dtype, str):
+                output_dtype = getattr(torch, output_dtype)
+            self.map(partial(cast_signal, dtype=output_dtype))
+
         if batch_size is not None:
             self.batched(batch_size, collation_fn=self.collate, partial=False)
 
@@ -743,12 +1419,31 @@ class CustomWebDataloader(wds.WebLoader):
         num_workers: int = 8,
         epoch_steps: Optional[int] = None,
         prefetch_factor: int = 2,
+        persistent_workers: bool = True,
+        pin_memory_device: str = "",
         **kwargs,
     ):
         self.dataset = dataset
+        # Wrap before handing the dataset to the DataLoader, so persistent
+        # workers keep iterating the same epoch-limited pipeline.
         if epoch_steps:
             dataset = dataset.with_epoch(epoch_steps)
 
+        # Prefetching more batches per worker mostly costs host memory;
+        # it doesn't make the workers decode any faster.
+        if prefetch_factor is not None and prefetch_factor > 4:
+            warnings.warn(
+                f"prefetch_factor={prefetch_factor} rarely improves throughput "
+                "over the default and increases host memory use.",
+                stacklevel=2,
+            )
+        # Keeping workers alive between epochs avoids re-forking them and
+        # re-opening the shard lists every epoch.
+        if num_workers > 0:
+            kwargs["persistent_workers"] = persistent_workers
+        if pin_memory_device:
+            kwargs["pin_memory_device"] = pin_memory_device
+
         super().__init__(
             dataset,
             num_workers=num_workers,
@@ -761,3 +1456,68 @@ class CustomWebDataloader(wds.WebLoader):
 
     def __len__(self):
         return len(self.dataset)
+
+
+def _record_stream(batch: Any, stream: "torch.cuda.Stream"):  # pragma: no cover
+    if isinstance(batch, dict):
+        for v in batch.values():
+            _record_stream(v, stream)
+    elif isinstance(batch, (list, tuple)):
+        for v in batch:
+            _record_stream(v, stream)
+    elif isinstance(batch, AudioSignal):
+        _record_stream(batch.audio_data, stream)
+    elif torch.is_tensor(batch) and batch.is_cuda:
+        batch.record_stream(stream)
+
+
+class CUDAPrefetcher:  # pragma: no cover
+    """Wraps a dataloader so that each batch is copied to the GPU on a
+    side CUDA stream while the previous batch is being used, overlapping
+    host to device copies with compute. Batches are moved with
+    :py:func:`audiotools.core.util.prepare_batch`. Copies are only
+    asynchronous if the dataloader pins memory (as
+    :py:class:`CustomWebDataloader` does).
+
+    Parameters
+    ----------
+    loader : Iterable
+        Dataloader to wrap.
+    device : str, optional
+        CUDA device to move batches to, by default "cuda"
+
+    Examples
+    --------
+    >>> dataloader = CUDAPrefetcher(CustomWebDataloader(dataset), "cuda")
+    >>> for batch in dataloader:
+    >>>     signal = batch["signal"]  # Already on the GPU.
+    """
+
+    def __init__(self, loader: Iterable, device: str = "cuda"):
+        self.loader = loader
+        self.device = torch.device(device)
+
+    def _preload(self, iterator, stream):
+        try:
+            batch = next(iterator)
+        except StopIteration:
+            return None
+        with torch.cuda.stream(stream):
+            return util.prepare_batch(batch, self.device, non_blocking=True)
+
+    def __iter__(self):
+        stream = torch.cuda.Stream(self.device)
+        iterator = iter(self.loader)
+        batch = self._preload(iterator, stream)
+        while batch is not None:
+            current_stream = torch.cuda.current_stream(self.device)
+            current_stream.wait_stream(stream)
+            # Tensors were allocated on the side stream, but are used on
+            # the current one from here on.
+            _record_stream(batch, current_stream)
+            next_batch = self._preload(iterator, stream)
+            yield batch
+            batch = next_batch
+
+    def __len__(self):
+        return len(self.loader)
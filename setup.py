@@ -37,6 +37,7 @@ setup(
         "argbind",
         "numpy",
         "soundfile",
+        "soxr",
         "pyloudnorm",
         "importlib-resources",
         "scipy",
@@ -80,5 +81,8 @@ setup(
         "whisper": [
             "transformers>=4.23.1",
         ],
+        "speedups": [
+            "orjson",
+        ],
     },
 )
@@ -143,6 +143,31 @@ def test_salient_excerpt(loudness_cutoff):
         )
 
 
+@pytest.mark.parametrize("loudness_cutoff", [None, -40])
+def test_salient_excerpts(loudness_cutoff):
+    sr = 16000
+    signal = AudioSignal(torch.zeros(sr * 20), sr)
+    signal[..., sr * 5 : sr * 15] = 0.1 * torch.randn(sr * 10)
+
+    excerpts = AudioSignal.salient_excerpts(
+        signal,
+        loudness_cutoff=loudness_cutoff,
+        duration=1,
+        num_excerpts=32,
+        num_tries=None if loudness_cutoff is not None else 8,
+        state=0,
+    )
+    assert excerpts.batch_size == 32
+    assert excerpts.signal_length == sr
+    if loudness_cutoff is not None:
+        assert (excerpts.loudness() > loudness_cutoff).all()
+
+    excerpts = AudioSignal.salient_excerpts(
+        signal, duration=1, num_excerpts=0.5, max_excerpts=4, state=0
+    )
+    assert excerpts.batch_size == 4
+
+
 def test_arithmetic():
     def _make_signals():
         array = np.random.randn(2, 16000)
@@ -52,6 +52,25 @@ def test_batch_loudness():
     assert np.allclose(py_loudness, at_loudness_batch, atol=1e-1)
 
 
+def test_windowed_loudness():
+    np.random.seed(0)
+    array = np.random.randn(1, 2, 16000 * 10) * np.linspace(0, 1, 16000 * 10)
+    array[..., 16000 * 3 : 16000 * 5] = 0
+    signal = AudioSignal(array, sample_rate=16000)
+
+    meter = Meter(16000)
+    energy = meter.cumulative_energy(signal.audio_data.permute(0, 2, 1))
+
+    window_length = int(1.3 * 16000)
+    for offset in [0, 12345, 16000 * 2, 16000 * 4, 16000 * 10 - window_length]:
+        excerpt = signal[..., offset : offset + window_length]
+        excerpt_loudness = meter.integrated_loudness(
+            excerpt.audio_data.permute(0, 2, 1)
+        )
+        at_loudness = meter.windowed_loudness(energy, offset, window_length)
+        assert np.allclose(excerpt_loudness, at_loudness, atol=1e-1)
+
+
 # Tests below are copied from pyloudnorm
 def test_integrated_loudness():
     data, rate = sf.read("tests/audio/loudness/sine_1000.wav")
@@ -87,6 +87,17 @@ def test_prepare_batch():
     batch = [torch.randn(1), np.random.randn(1)]
     util.prepare_batch(batch)
 
+    class DeviceOnly:
+        def to(self, device):
+            moved = DeviceOnly()
+            moved.device = device
+            return moved
+
+    batch = util.prepare_batch({"value": DeviceOnly()}, "meta")
+    assert batch["value"].device == "meta"
+    batch = util.prepare_batch([DeviceOnly()], "meta")
+    assert batch[0].device == "meta"
+
 
 def test_sample_dist():
     state = util.random_state(0)
@@ -1,9 +1,16 @@
+import copy
+import io
+import os
+import subprocess
+import sys
 import tempfile
 from pathlib import Path
 
 import numpy as np
 import pytest
+import soundfile
 import torch
+import webdataset as wds
 
 import audiotools
 from audiotools.data import transforms as tfm
@@ -32,10 +39,34 @@ def test_align_lists():
     input_lists = _preprocess(input_lists)
     target_lists = _preprocess(target_lists)
 
-    aligned_lists = audiotools.datasets.align_lists(input_lists)
+    aligned_lists = audiotools.datasets.align_lists(copy.deepcopy(input_lists))
+    assert target_lists == aligned_lists
+
+    def matcher(x, y):
+        return Path(x).parent == Path(y).parent
+
+    aligned_lists = audiotools.datasets.align_lists(input_lists, matcher)
     assert target_lists == aligned_lists
 
 
+def test_align_lists_multiple_files_per_folder():
+    input_lists = [
+        [{"path": "a/1.wav"}, {"path": "a/2.wav"}, {"path": "b/1.wav"}],
+        [{"path": "a/3.wav"}, {"path": "b/2.wav"}, {"path": "b/3.wav"}],
+    ]
+    aligned_lists = audiotools.datasets.align_lists(input_lists)
+    assert aligned_lists[0] == [
+        {"path": "a/1.wav"},
+        {"path": "a/2.wav"},
+        {"path": "b/1.wav"},
+    ]
+    assert aligned_lists[1] == [
+        {"path": "a/3.wav"},
+        {"path": "none"},
+        {"path": "b/2.wav"},
+    ]
+
+
 def test_audio_dataset():
     transform = tfm.Compose(
         [
@@ -109,6 +140,23 @@ def test_aligned_audio_dataset():
                 assert np.all(col == col[0])
 
 
+def test_build_loaders():
+    with tempfile.TemporaryDirectory() as d:
+        dataset_dir = Path(d)
+        audiotools.util.generate_chord_dataset(
+            max_voices=6, num_items=4, output_dir=dataset_dir, duration=0.1
+        )
+        loader_kwargs = {
+            f"voice_{i}": {"sources": [dataset_dir], "ext": [f"voice_{i}.wav"]}
+            for i in range(6)
+        }
+        loaders = audiotools.data.datasets.build_loaders(loader_kwargs)
+        assert list(loaders.keys()) == list(loader_kwargs.keys())
+        for k, kwargs in loader_kwargs.items():
+            loader = audiotools.data.datasets.AudioLoader(**kwargs)
+            assert loaders[k].audio_lists == loader.audio_lists
+
+
 def test_loader_without_replacement():
     with tempfile.TemporaryDirectory() as d:
         dataset_dir = Path(d)
@@ -166,6 +214,265 @@ def test_loader_out_of_range():
             item_idx=101,
         )
         assert item["path"] == "none"
+        assert "path" not in item["signal"].metadata
+
+        item = loader(
+            sample_rate=44100,
+            duration=0.01,
+            state=audiotools.util.random_state(0),
+            source_idx=0,
+            item_idx=0,
+            offset=0.0,
+        )
+        assert item["signal"].metadata["path"] == item["path"]
+
+
+_LOG_CORRUPT_SCRIPT = """
+import multiprocessing
+import sys
+
+from audiotools.data import datasets
+
+datasets._CORRUPT_LOG = sys.argv[1]
+
+
+def worker():
+    for i in range(200):
+        datasets._log_corrupt(f"worker/{i}.wav")
+
+
+for i in range(200):
+    datasets._log_corrupt(f"main/{i}.wav")
+process = multiprocessing.get_context("fork").Process(target=worker)
+process.start()
+process.join()
+"""
+
+
+def test_log_corrupt():
+    with tempfile.TemporaryDirectory() as d:
+        log_path = Path(d) / "corrupt.txt"
+        subprocess.run(
+            [sys.executable, "-c", _LOG_CORRUPT_SCRIPT, str(log_path)], check=True
+        )
+        lines = log_path.read_text().splitlines()
+        assert sorted(lines) == sorted(
+            [f"{name}/{i}.wav" for name in ["main", "worker"] for i in range(200)]
+        )
+
+
+def test_audio_columns():
+    audio_list = [
+        {"path": "a/1.wav", "n_frames": 100, "sample_rate": 44100, "num_channels": 2},
+        {"path": "none"},
+        {"path": "b/ü.wav", "label": "x"},
+    ]
+    columns = audiotools.data.datasets._AudioColumns(audio_list)
+    assert len(columns) == 3
+    assert list(columns) == audio_list
+    assert columns[-1] == audio_list[-1]
+    with pytest.raises(IndexError):
+        columns[3]
+
+    # Fields on every row are stored as columns rather than per-row dicts.
+    audio_list = [
+        {"path": f"{i}.wav", "loudness": f"-{i}.0", "n_frames": i} for i in range(5)
+    ]
+    audio_list[2] = {"path": "none"}
+    columns = audiotools.data.datasets._AudioColumns(audio_list)
+    assert list(columns) == audio_list
+    assert set(columns._columns) == {"path", "loudness", "n_frames"}
+    assert not columns._attrs
+
+
+def test_loader_non_utf8_path():
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(os.fsencode(d), b"caf\xe9.wav")
+        soundfile.write(path, np.zeros(4410), 44100)
+
+        loader = audiotools.data.datasets.AudioLoader([d], index_headers=True)
+        audio_info = loader.audio_lists[0][0]
+        assert os.fsencode(audio_info["path"]) == path
+        assert audio_info["n_frames"] == 4410
+
+        state = audiotools.util.random_state(0)
+        item = loader(state, 44100, duration=0.05, loudness_cutoff=None, global_idx=0)
+        assert os.fsencode(item["path"]) == path
+        assert item["signal"].signal_length == 2205
+
+        item = loader(state, 44100, duration=0.05, offset=0.0, source_idx=0, item_idx=0)
+        assert item["signal"].signal_length == 2205
+
+
+def test_loader_index_headers():
+    with tempfile.TemporaryDirectory() as d:
+        dataset_dir = Path(d)
+        audiotools.util.generate_chord_dataset(
+            max_voices=1,
+            num_items=10,
+            output_dir=dataset_dir,
+            duration=1.0,
+        )
+        csv_path = dataset_dir / "voice_0.csv"
+        loader = audiotools.data.datasets.AudioLoader([csv_path], index_headers=True)
+        assert csv_path.with_suffix(".headers.pkl").exists()
+
+        for audio_info in loader.audio_lists[0]:
+            assert audio_info["sample_rate"] == 44100
+            assert audio_info["num_channels"] == 1
+            assert audio_info["n_frames"] > 0
+
+        for idx in range(10):
+            state = audiotools.util.random_state(idx)
+            item = loader(state, 44100, duration=0.5, global_idx=idx)
+            signal = item["signal"]
+            assert signal.signal_length == 22050
+            assert 0 <= signal.metadata["offset"] <= 0.5
+            for key in ["n_frames", "sample_rate", "num_channels"]:
+                assert key not in signal.metadata
+
+            start = round(signal.metadata["offset"] * 44100)
+            reference, _ = soundfile.read(item["path"], start=start, frames=22050)
+            assert np.allclose(signal.audio_data.numpy().flatten(), reference)
+
+            # Aligned loaders re-read the excerpt from its offset.
+            aligned = loader(
+                state,
+                44100,
+                duration=0.5,
+                offset=signal.metadata["offset"],
+                offset_frame=signal.metadata["offset_frame"],
+                source_idx=item["source_idx"],
+                item_idx=item["item_idx"],
+            )["signal"]
+            assert torch.allclose(signal.audio_data, aligned.audio_data)
+
+        # Second construction reads the persisted index.
+        cached = audiotools.data.datasets.AudioLoader([csv_path], index_headers=True)
+        assert cached.audio_lists == loader.audio_lists
+        assert not list(dataset_dir.glob("*.tmp"))
+
+
+def test_audio_dataset_attributes_reach_loaders():
+    with tempfile.TemporaryDirectory() as d:
+        for i in range(2):
+            audio = np.random.uniform(-0.5, 0.5, 16000)
+            soundfile.write(os.path.join(d, f"{i}.wav"), audio, 16000)
+        loader = audiotools.data.datasets.AudioLoader([d], index_headers=True)
+        dataset = audiotools.data.datasets.AudioDataset(loader, 16000, duration=0.5)
+        assert dataset[0]["signal"].signal_length == 8000
+
+        dataset.duration = 0.25
+        dataset.sample_rate = 8000
+        signal = dataset[0]["signal"]
+        assert signal.sample_rate == 8000
+        assert signal.signal_length == 2000
+
+
+def test_loader_audio_indices():
+    with tempfile.TemporaryDirectory() as d:
+        sources = [os.path.join(d, "a"), os.path.join(d, "b")]
+        for source, n_files in zip(sources, [3, 5]):
+            os.makedirs(source)
+            for i in range(n_files):
+                soundfile.write(os.path.join(source, f"{i}.wav"), np.zeros(10), 16000)
+
+        expected = [(0, i) for i in range(3)] + [(1, i) for i in range(5)]
+        loader = audiotools.data.datasets.AudioLoader(sources, shuffle=False)
+        assert loader.audio_indices == expected
+
+        loader = audiotools.data.datasets.AudioLoader(sources, shuffle_state=3)
+        audiotools.util.random_state(3).shuffle(expected)
+        assert loader.audio_indices == expected
+
+
+def test_loader_salient_read_retries(monkeypatch):
+    seeks = []
+    seek = soundfile.SoundFile.seek
+
+    def _counting_seek(self, frames, *args, **kwargs):
+        # soundfile also seeks relative to the current position internally.
+        if not args and not kwargs:
+            seeks.append(frames)
+        return seek(self, frames, *args, **kwargs)
+
+    monkeypatch.setattr(soundfile.SoundFile, "seek", _counting_seek)
+
+    with tempfile.TemporaryDirectory() as d:
+        sr = 16000
+        audio = np.zeros(sr * 4)
+        soundfile.write(os.path.join(d, "silent.wav"), audio, sr)
+        audio[sr * 3 :] = np.random.uniform(-0.5, 0.5, sr)
+        soundfile.write(os.path.join(d, "partly_silent.wav"), audio, sr)
+
+        loader = audiotools.data.datasets.AudioLoader(
+            [d], shuffle=False, index_headers=True
+        )
+        partly_silent, silent = loader.audio_lists[0]
+        read = audiotools.data.datasets.AudioLoader._salient_read
+        state = audiotools.util.random_state(0)
+
+        # Gives up on a silent file after num_tries seeks.
+        signal = read(silent, 0.5, state, loudness_cutoff=-40, num_tries=5)
+        assert len(seeks) == 5
+        assert signal.signal_length == sr // 2
+
+        # Retries until it lands on the loud part.
+        seeks.clear()
+        signal = read(partly_silent, 0.5, state, loudness_cutoff=-40, num_tries=None)
+        assert len(seeks) > 1
+        assert seeks[-1] + sr // 2 > sr * 3
+        assert signal.loudness() > -40
+        assert signal.metadata["offset"] == seeks[-1] / sr
+
+        # A stale header that points past the end of the file reads
+        # nothing, which is logged and replaced by silence.
+        soundfile.write(os.path.join(d, "silent.wav"), np.zeros(10), sr)
+        logged = []
+        monkeypatch.setattr(audiotools.data.datasets, "_log_corrupt", logged.append)
+        item = loader(state, sr, duration=0.5, source_idx=0, item_idx=1)
+        assert logged == [silent["path"]]
+        assert item["signal"].signal_length == sr // 2
+        assert not item["signal"].audio_data.any()
+
+
+def test_loader_with_offset():
+    with tempfile.TemporaryDirectory() as d:
+        dataset_dir = Path(d)
+        audiotools.util.generate_chord_dataset(
+            max_voices=1, num_items=3, output_dir=dataset_dir, duration=1.0
+        )
+        loader = audiotools.data.datasets.AudioLoader([dataset_dir], shuffle=False)
+
+        for idx in range(3):
+            item = loader(
+                audiotools.util.random_state(idx),
+                44100,
+                duration=0.5,
+                offset=0.25,
+                source_idx=0,
+                item_idx=idx,
+            )
+            signal = item["signal"]
+            assert signal.metadata["offset"] == 0.25
+            assert signal.metadata["duration"] == 0.5
+
+            reference = audiotools.AudioSignal(item["path"], offset=0.25, duration=0.5)
+            assert torch.allclose(signal.audio_data, reference.audio_data)
+
+        # Without a recorded frame, offsets that don't round-trip through
+        # frame / sample_rate start on the same frame as librosa.
+        frame = next(k for k in range(1, 44100) if int(k / 44100 * 44100) != k)
+        path = loader.audio_lists[0][0]["path"]
+        read = audiotools.data.datasets.AudioLoader._fast_read
+        signal = read(path, frame / 44100, 0.1)
+        reference = audiotools.AudioSignal(path, offset=frame / 44100, duration=0.1)
+        assert torch.allclose(signal.audio_data, reference.audio_data)
+
+        # With the frame recorded by _salient_read, it starts exactly there.
+        signal = read(path, frame / 44100, 0.1, offset_frame=frame)
+        reference, _ = soundfile.read(path, start=frame, frames=4410)
+        assert np.allclose(signal.audio_data.numpy().flatten(), reference)
 
 
 def test_dataset_pipeline():
@@ -192,14 +499,215 @@ def test_dataset_pipeline():
         batch = dataset.transform(signal, **kwargs)
 
 
+def test_decode_json():
+    decode_json = audiotools.data.datasets.decode_json
+    assert decode_json("json", b'{"id": 1, "tags": ["a"]}') == {"id": 1, "tags": ["a"]}
+    assert decode_json("meta.json", '{"id": 1}') == {"id": 1}
+    assert decode_json("wav", b"RIFF") is None
+
+    decoded = decode_json("json", b'{"bpm": NaN, "gain": Infinity}')
+    assert np.isnan(decoded["bpm"])
+    assert decoded["gain"] == float("inf")
+    assert decode_json("json", b'{"id": 18446744073709551616}') == {"id": 2**64}
+
+
+def test_decode_audiosignal():
+    sample_rate = 16000
+    audio = np.random.uniform(-0.5, 0.5, size=(3 * sample_rate, 2))
+    sample = {"__key__": "x"}
+    # MP3 doesn't start with any of the magic bytes decoded by soundfile
+    # directly, so it goes through the AudioSignal fallback.
+    for fmt in ["WAV", "FLAC", "MP3"]:
+        buf = io.BytesIO()
+        soundfile.write(buf, audio, sample_rate, format=fmt)
+        sample[fmt.lower()] = buf.getvalue()
+
+        outputs = list(
+            audiotools.data.datasets.decode_audiosignal(
+                [dict(sample)],
+                duration=1.0,
+                state=audiotools.util.random_state(0),
+                num_channels=1,
+                sample_rate=sample_rate,
+                num_excerpts=4,
+            )
+        )
+        assert len(outputs) == 4
+        for output in outputs:
+            signal = output["signal"]
+            assert signal.num_channels == 1
+            assert signal.signal_length == sample_rate
+            assert output["__key__"] == "x"
+        sample.pop(fmt.lower())
+
+
+def test_decode_audiosignal_threaded():
+    sample_rate = 16000
+    data = []
+    for i in range(10):
+        buf = io.BytesIO()
+        audio = np.random.uniform(-0.5, 0.5, size=(sample_rate, 1))
+        soundfile.write(buf, audio, sample_rate, format="WAV")
+        data.append({"__key__": str(i), "wav": buf.getvalue()})
+
+    def _decode(num_threads):
+        return list(
+            audiotools.data.datasets.decode_audiosignal(
+                [dict(sample) for sample in data],
+                duration=0.5,
+                state=audiotools.util.random_state(0),
+                sample_rate=sample_rate,
+                num_excerpts=2,
+                num_threads=num_threads,
+            )
+        )
+
+    outputs = _decode(4)
+    assert [o["__key__"] for o in outputs] == [
+        str(i) for i in range(10) for _ in range(2)
+    ]
+
+    # Excerpts only depend on the seed, not on thread scheduling.
+    for num_threads in [4, 2]:
+        for output, other in zip(outputs, _decode(num_threads)):
+            assert output["signal"].metadata["offset"] == (
+                other["signal"].metadata["offset"]
+            )
+            assert torch.equal(output["signal"].audio_data, other["signal"].audio_data)
+
+
+def test_mono_resample():
+    t = torch.arange(44100 + 7) / 44100
+    audio_data = torch.stack(
+        [torch.sin(2 * np.pi * 440 * t), 0.5 * torch.sin(2 * np.pi * 220 * t)]
+    )
+    signal = audiotools.AudioSignal(audio_data[None].repeat(3, 1, 1), 44100)
+
+    fused = audiotools.data.datasets._mono_resample(signal.clone(), 16000)
+    reference = signal.clone().to_mono().resample(16000)
+    assert fused.sample_rate == 16000
+    assert fused.audio_data.shape == reference.audio_data.shape
+    assert torch.allclose(
+        fused.audio_data[..., 100:-100], reference.audio_data[..., 100:-100], atol=1e-3
+    )
+
+
+def _write_shard(path, n_items=4, sample_rate=16000):
+    with wds.TarWriter(str(path)) as sink:
+        for i in range(n_items):
+            buf = io.BytesIO()
+            audio = np.random.uniform(-0.5, 0.5, size=(sample_rate, 2))
+            soundfile.write(buf, audio, sample_rate, format="WAV")
+            sink.write(
+                {"__key__": f"{i:04d}", "wav": buf.getvalue(), "json": {"id": i}}
+            )
+
+
+def test_custom_web_dataset():
+    with tempfile.TemporaryDirectory() as d:
+        shard = Path(d) / "shard.tar"
+        _write_shard(shard)
+
+        dataset = audiotools.data.datasets.CustomWebDataset(
+            str(shard),
+            resampled=False,
+            duration=0.5,
+            sample_rate=16000,
+            state=audiotools.util.random_state(0),
+            transform=tfm.VolumeNorm(),
+            num_excerpts=2,
+        )
+        items = list(dataset)
+        assert len(items) == 8
+        for item in items:
+            assert item["signal"].signal_length == 8000
+            assert item["signal"].metadata["id"] in range(4)
+            assert "VolumeNorm" in item["transform_args"]
+
+
+def test_custom_web_dataloader():
+    with tempfile.TemporaryDirectory() as d:
+        shard = Path(d) / "shard.tar"
+        _write_shard(shard)
+
+        dataset = audiotools.data.datasets.CustomWebDataset(
+            str(shard),
+            resampled=False,
+            batch_size=2,
+            duration=0.5,
+            sample_rate=16000,
+            num_excerpts=1,
+        )
+        dataloader = audiotools.data.datasets.CustomWebDataloader(
+            dataset, num_workers=1
+        )
+        assert dataloader.pipeline[0].persistent_workers
+        for _ in range(2):
+            batches = list(dataloader)
+            assert len(batches) == 2
+
+        with pytest.warns(UserWarning, match="prefetch_factor"):
+            audiotools.data.datasets.CustomWebDataloader(
+                dataset, num_workers=1, prefetch_factor=8
+            )
+
+
+def test_cuda_prefetcher_cpu():
+    batches = [
+        {"signal": audiotools.AudioSignal(torch.randn(4, 1, 100), 44100), "idx": i}
+        for i in range(3)
+    ]
+    prefetcher = audiotools.data.datasets.CUDAPrefetcher(batches, "cpu")
+    assert len(prefetcher) == 3
+    # CPU tensors aren't recorded on any stream, so traversal is a no-op.
+    audiotools.data.datasets._record_stream(
+        [batches[0], (torch.randn(2), "string")], None
+    )
+
+
+@pytest.mark.skipif(not torch.cuda.is_available(), reason="Requires CUDA.")
+def test_cuda_prefetcher():
+    batches = [
+        {"signal": audiotools.AudioSignal(torch.randn(4, 1, 100), 44100), "idx": i}
+        for i in range(3)
+    ]
+    prefetcher = audiotools.data.datasets.CUDAPrefetcher(batches, "cuda")
+    assert len(prefetcher) == 3
+    for i, batch in enumerate(prefetcher):
+        assert batch["signal"].device.type == "cuda"
+        assert batch["idx"] == i
+
+
+@pytest.mark.parametrize("output_dtype", ["bfloat16", "int16"])
+def test_custom_web_dataset_output_dtype(output_dtype):
+    with tempfile.TemporaryDirectory() as d:
+        shard = Path(d) / "shard.tar"
+        _write_shard(shard)
+
+        dataset = audiotools.data.datasets.CustomWebDataset(
+            str(shard),
+            resampled=False,
+            batch_size=2,
+            duration=0.5,
+            sample_rate=16000,
+            num_excerpts=1,
+            output_dtype=output_dtype,
+        )
+        for batch in dataset:
+            audio_data = batch["signal"].audio_data
+            assert audio_data.dtype == getattr(torch, output_dtype)
+            assert audio_data.shape == (2, 1, 8000)
+
+
 class NumberDataset:
-    def __init__(self):
-        pass
+    def __init__(self, length: int = 10):
+        self.length = length
 
     def __len__(self):
-        return 10
+        return self.length
 
     def __getitem__(self, idx):
+        assert 0 <= idx < self.length
         return {"idx": idx}
 
 
@@ -216,3 +724,12 @@ def test_concat_dataset():
         t += [i, i, i]
 
     assert x == t
+
+
+def test_concat_dataset_unequal_lengths():
+    d = audiotools.datasets.ConcatDataset(
+        [NumberDataset(2), NumberDataset(4), NumberDataset(3)]
+    )
+    assert len(d) == 9
+    x = [d[i]["idx"] for i in range(len(d))]
+    assert x == [0, 0, 0, 1, 1, 1, 2, 2, 3]